@@ -1,13 +1,78 @@
+import asyncio
+import concurrent.futures
 import hashlib
+import json
+import mmap
+import os
+import tempfile
 from typing import Any
 
 from langchain_core.documents import Document
 from langflow.custom import Component
-from langflow.io import MessageTextInput, Output, SecretStrInput
+from langflow.io import BoolInput, IntInput, MessageTextInput, Output, SecretStrInput, StrInput
 from langflow.schema import Data
 from pydantic.v1 import SecretStr
 
 
+def _run_coroutine(coro):
+    """Run a coroutine to completion, also when called from inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+# Blobs at least this large are streamed to a temporary file and memory-mapped instead of read into memory
+_SPOOL_THRESHOLD = 64 * 1024 * 1024
+# Number of client-side MD5 digests computed in parallel; hashlib releases the GIL for buffers over 2 KiB
+_MD5_BATCH_SIZE = 8
+# Suffix of the file holding ETags of a deferred load until commit_etag_cache merges them
+_PENDING_SUFFIX = ".pending"
+
+
+def _read_etag_cache(path: str) -> dict[str, dict[str, str]]:
+    """Read a per-container map of blob name to ETag, or an empty map when ``path`` does not exist."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_etag_cache(path: str, etag_cache: dict[str, dict[str, str]]) -> None:
+    """Atomically write a per-container map of blob name to ETag to ``path``."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(etag_cache, f)
+    os.replace(tmp_path, path)
+
+
+def commit_etag_cache(cache_path: str) -> None:
+    """Merge the ETags a deferred load left in ``<cache_path>.pending`` into the ETag cache.
+
+    Call this once the documents from that load have been ingested successfully. Until then the
+    blobs are not in the cache and are downloaded again on the next run.
+    """
+    pending_path = f"{cache_path}{_PENDING_SUFFIX}"
+    pending = _read_etag_cache(pending_path)
+    if not pending:
+        return
+    etag_cache = _read_etag_cache(cache_path)
+    for container, etags in pending.items():
+        etag_cache.setdefault(container, {}).update(etags)
+    _write_etag_cache(cache_path, etag_cache)
+    os.remove(pending_path)
+
+
+def _md5_batch(payloads: list[bytes]) -> list[str]:
+    """Return the MD5 hex digests of several independent buffers, hashing them on a thread pool."""
+    if len(payloads) < 2:
+        return [hashlib.md5(payload).hexdigest() for payload in payloads]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(_MD5_BATCH_SIZE, len(payloads))) as executor:
+        return list(executor.map(lambda payload: hashlib.md5(payload).hexdigest(), payloads))
+
+
 class AzureBlobLoader(Component):
     display_name = "Azure Blob Markdown Loader"
     name = "AzureBlobMarkdownLoader"
@@ -36,47 +101,172 @@ class AzureBlobLoader(Component):
             value="AZURE_STORAGE_CONNECTION_STRING",
             required=True,
         ),
+        IntInput(
+            name="max_concurrency",
+            display_name="Max Concurrent Downloads",
+            info="Maximum number of blobs downloaded at the same time",
+            value=16,
+            advanced=True,
+        ),
+        IntInput(
+            name="download_concurrency",
+            display_name="Per-Blob Download Concurrency",
+            info="Number of parallel ranged requests used to download a single large blob",
+            value=8,
+            advanced=True,
+        ),
+        IntInput(
+            name="download_chunk_size",
+            display_name="Download Chunk Size (bytes)",
+            info="Size of each ranged request when downloading a large blob",
+            value=16 * 1024 * 1024,
+            advanced=True,
+        ),
+        StrInput(
+            name="cache_path",
+            display_name="ETag Cache Path",
+            info="JSON file remembering the ETag of every loaded blob; unchanged blobs are skipped on later runs. "
+            "Leave empty to always load every blob. Without 'Defer ETag Cache Commit', ETags are saved as soon as "
+            "the blobs are loaded: if the downstream ingest then fails, those blobs are skipped on every later run. "
+            "Do not combine with an overwrite ingest that deletes the collection, which would keep only the changed "
+            "blobs.",
+            value="",
+            advanced=True,
+        ),
+        BoolInput(
+            name="defer_cache_commit",
+            display_name="Defer ETag Cache Commit",
+            info="Write the ETags of loaded blobs to '<ETag Cache Path>.pending' instead of the cache. Build the "
+            "'ETag Cache Commit' output after the ingest succeeds; until then the blobs are loaded again.",
+            value=False,
+            advanced=True,
+        ),
     ]
 
     outputs = [
         Output(display_name="data", name="data", method="build"),
+        # Langflow builds connected outputs together, so build this one in a later run once the ingest succeeded
+        Output(display_name="ETag Cache Commit", name="cache_commit", method="commit_cache"),
         # Output(display_name="DataFrame", name="dataframe", method="as_dataframe")
     ]
 
     def build(self, **kwargs: Any) -> list[Data]:
-        # Connect to Azure Blob Storage
-        container = self.container_name
-        Suffix = self.filter_suffix
         conn_str = SecretStr(self.connection_string).get_secret_value() if self.connection_string else None
         if not conn_str:
             raise RuntimeError("Azure connection string not passed. Please pass it in Input")
-        from azure.storage.blob import BlobServiceClient
 
-        service_client = BlobServiceClient.from_connection_string(conn_str)
-        container_client = service_client.get_container_client(container)
+        documents = _run_coroutine(self._abuild(conn_str))
+        self.status = f"Processed {len(documents)} files successfully."
+        return documents
 
-        documents = []
-        self.log(
-            f"Following blobs will be processed {container_client.list_blobs()}",
+    def commit_cache(self) -> Data:
+        """Merge the ETags left pending by deferred loads into the ETag cache."""
+        if not self.cache_path:
+            raise ValueError("ETag Cache Path is not set, there is no ETag cache to commit")
+        commit_etag_cache(self.cache_path)
+        self.status = f"Committed pending ETags to {self.cache_path}"
+        return Data(data={"cache_path": self.cache_path})
+
+    async def _abuild(self, conn_str: str) -> list[Data]:
+        """Download all matching blobs concurrently and convert them to Data objects."""
+        from azure.storage.blob.aio import BlobServiceClient
+
+        # Connect to Azure Blob Storage
+        container = self.container_name
+        Suffix = self.filter_suffix
+        max_concurrency = int(self.max_concurrency or 16)
+        download_concurrency = int(self.download_concurrency or 1)
+        sem = asyncio.Semaphore(max(max_concurrency, 1))
+        etag_cache = self._load_etag_cache()
+        known_etags = etag_cache.get(container, {})
+
+        service_client = BlobServiceClient.from_connection_string(
+            conn_str, max_chunk_get_size=int(self.download_chunk_size or 16 * 1024 * 1024)
         )
-        # List blobs (filter by prefix if provided) and download .md files
-        for blob in container_client.list_blobs():
-            if not blob.name.lower().endswith(Suffix):
-                continue
-            content_bytes = container_client.download_blob(blob.name).readall()
+        async with service_client:
+            container_client = service_client.get_container_client(container)
+
+            async def _fetch(blob):
+                async with sem:
+                    stream = await container_client.download_blob(blob.name, max_concurrency=download_concurrency)
+                    if stream.size < _SPOOL_THRESHOLD:
+                        return blob, await stream.readall()
+                    # Large blob: write the chunks to disk and map them, keeping the raw bytes off the heap
+                    with tempfile.TemporaryFile() as spool:
+                        await stream.readinto(spool)
+                        spool.flush()
+                        return blob, mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+
+            # List blobs and schedule a download for every new or changed file matching the suffix. The task
+            # group cancels the other downloads as soon as one fails, before the service client is closed.
+            tasks = []
+            skipped = 0
             try:
-                text = content_bytes.decode("utf-8")
-            except UnicodeDecodeError:
-                text = content_bytes.decode("utf-8", errors="ignore")
-            checksum = hashlib.md5(content_bytes).hexdigest()  # MD5 checksum for content
-            etag = blob.etag.strip('"') if blob.etag else None  # strip quotes from ETag
+                async with asyncio.TaskGroup() as task_group:
+                    async for blob in container_client.list_blobs():
+                        if not blob.name.lower().endswith(Suffix):
+                            continue
+                        if blob.etag and known_etags.get(blob.name) == blob.etag:
+                            skipped += 1
+                            continue
+                        tasks.append(task_group.create_task(_fetch(blob)))
+                    self.log(
+                        f"Downloading {len(tasks)} blobs with up to {max_concurrency} concurrent requests "
+                        f"({skipped} unchanged blobs skipped)"
+                    )
+            except ExceptionGroup as eg:
+                # Surface the first failure itself, as callers saw it before the task group
+                raise eg.exceptions[0] from eg
+            results = [task.result() for task in tasks]
 
-            self.log(f"Fetched content from {blob.name}")
-            self.log(f"decoded content is {text}")
+        # Prefer the MD5 stored by Azure at upload time, hash on the client only when it is missing
+        checksums = [self._server_md5(blob) for blob, _ in results]
+        missing = [i for i, checksum in enumerate(checksums) if checksum is None]
+        for i, digest in zip(missing, _md5_batch([results[i][1] for i in missing]), strict=True):
+            checksums[i] = digest
+
+        documents = []
+        for (blob, content), checksum in zip(results, checksums, strict=True):
+            # Single decoding pass; invalid UTF-8 bytes are dropped
+            text = str(content, "utf-8", "ignore")
+            if isinstance(content, mmap.mmap):
+                content.close()
+            etag = blob.etag.strip('"') if blob.etag else None  # strip quotes from ETag
 
             # Create Document with content and metadata (source path, etag, checksum)
             doc = Document(page_content=text, metadata={"source": blob.name, "etag": etag, "checksum": checksum})
 
             documents.append(Data.from_document(doc))
-        self.status = f"Processed {len(documents)} files successfully."
+        self.log(f"Fetched content from {len(documents)} blobs")
+
+        if self.cache_path:
+            loaded_etags = {blob.name: blob.etag for blob, _ in results if blob.etag}
+            if self.defer_cache_commit:
+                if loaded_etags:
+                    # Merge so uncommitted ETags of earlier loads, also of other containers, are kept
+                    pending_path = f"{self.cache_path}{_PENDING_SUFFIX}"
+                    pending = _read_etag_cache(pending_path)
+                    pending.setdefault(container, {}).update(loaded_etags)
+                    _write_etag_cache(pending_path, pending)
+            else:
+                known_etags.update(loaded_etags)
+                etag_cache[container] = known_etags
+                _write_etag_cache(self.cache_path, etag_cache)
         return documents
+
+    @staticmethod
+    def _server_md5(blob) -> str | None:
+        """Return the hex Content-MD5 Azure stored for ``blob``, if any."""
+        content_settings = blob.content_settings
+        server_md5 = content_settings.content_md5 if content_settings else None
+        return server_md5.hex() if server_md5 else None
+
+    def _load_etag_cache(self) -> dict[str, dict[str, str]]:
+        """Load the per-container map of blob name to ETag from ``cache_path``."""
+        if not self.cache_path:
+            return {}
+        try:
+            return _read_etag_cache(self.cache_path)
+        except (OSError, ValueError) as e:
+            self.log(f"Ignoring unreadable ETag cache {self.cache_path}: {e}")
+            return {}
@@ -1,6 +1,12 @@
-import hashlib
+import asyncio
+import concurrent.futures
+import itertools
+import re
+import threading
 import uuid
 
+import numpy as np
+import xxhash
 from langchain.embeddings.base import Embeddings
 from langchain_qdrant import Qdrant
 from langflow.base.vectorstores.model import LCVectorStoreComponent, check_cached_vector_store
@@ -14,8 +20,274 @@ from langflow.io import (
     StrInput,
 )
 from langflow.schema import Data
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    Batch,
+    Distance,
+    OptimizersConfigDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    VectorParams,
+)
+
+try:
+    from numba import njit
+except ImportError:  # Optional: install the "jit" extra to compile the batch etag and checksum parser
+    njit = None
+
+# Points per upsert request; a few hundred points stays well under gRPC's message size limit for typical embeddings
+_DEFAULT_UPLOAD_BATCH_SIZE = 256
+# Uploads with at least this many points pause HNSW indexing until all batches are in
+_BULK_UPLOAD_SIZE = 10_000
+# Qdrant's default indexing threshold, restored when the collection did not report one
+_DEFAULT_INDEXING_THRESHOLD = 20_000
+# Number of point IDs fetched per scroll or retrieve request when looking up existing points
+_SCROLL_PAGE_SIZE = 10_000
+# Quotes and hex prefixes removed from etags before parsing them as integers
+_ETAG_STRIP_RE = re.compile(r'"|0[xX]')
+_HEX_RE = re.compile(r"[0-9a-fA-F]+")
+# Strategies whose IDs only change when the document content changes, so an existing ID means nothing to update
+_CONTENT_DERIVED_STRATEGIES = frozenset({"content_hash", "etag", "checksum"})
+# Qdrant distance per distance_func option
+_DISTANCE_FUNCS = {
+    "Cosine": Distance.COSINE,
+    "Euclidean": Distance.EUCLID,
+    "Dot Product": Distance.DOT,
+}
+# Quantile of vector components that sets the int8 range; the remaining outliers are clipped
+_QUANTIZATION_QUANTILE = 0.99
+# Batches with at least this many documents use the batch ID generators in _BULK_ID_STRATEGIES
+_VECTORIZE_MIN_BATCH = 64
+# Per-document debug logs are only written for the first few documents and every N-th one after that
+_LOG_SAMPLE_HEAD = 5
+_LOG_SAMPLE_EVERY = 1000
+
+
+def _is_log_sample(index: int) -> bool:
+    """Return whether the per-document debug log for ``index`` should be written."""
+    return index < _LOG_SAMPLE_HEAD or index % _LOG_SAMPLE_EVERY == 0
+
+
+def _fold_hex_rows_numpy(digits: np.ndarray) -> np.ndarray:
+    """Fold each row of 16 ASCII hex digits into a uint64 with SWAR arithmetic on whole-array NumPy kernels.
+
+    Each row is read as two little-endian words of 8 digits, all 8 digits of a word are decoded at once,
+    and the nibbles are packed by halving the lane width three times.
+    """
+    words = np.ascontiguousarray(digits).view("<u8")
+    # '0'-'9' keep their low nibble; 'a'-'f' and 'A'-'F' have bit 6 set and a low nibble of 1-6
+    nibbles = (words & np.uint64(0x0F0F0F0F0F0F0F0F)) + np.uint64(9) * (
+        (words >> np.uint64(6)) & np.uint64(0x0101010101010101)
+    )
+    # Put the first digit of each word in its top byte, then merge neighbouring lanes: 8 -> 16 -> 32 bits
+    packed = nibbles.byteswap()
+    packed = (packed | (packed >> np.uint64(4))) & np.uint64(0x00FF00FF00FF00FF)
+    packed = (packed | (packed >> np.uint64(8))) & np.uint64(0x0000FFFF0000FFFF)
+    packed = (packed | (packed >> np.uint64(16))) & np.uint64(0x00000000FFFFFFFF)
+    return (packed[:, 0] << np.uint64(32)) | packed[:, 1]
+
+
+def _fold_hex_rows_loop(digits: np.ndarray) -> np.ndarray:
+    """Fold each row of 16 ASCII hex digits into a uint64 one nibble at a time, for Numba to compile."""
+    out = np.empty(digits.shape[0], dtype=np.uint64)
+    for row in range(digits.shape[0]):
+        value = np.uint64(0)
+        for col in range(16):
+            char = digits[row, col]
+            value = (value << np.uint64(4)) | np.uint64((char & 0x0F) + 9 * (char >> 6))
+        out[row] = value
+    return out
+
+
+# The compiled loop makes one pass without NumPy's temporary arrays. It is not cached to disk because
+# Langflow loads components from source, where Numba has no file to key the cache on.
+_fold_hex_rows = njit(nogil=True)(_fold_hex_rows_loop) if njit is not None else _fold_hex_rows_numpy
+
+
+def _hex_to_uint64(values: list[str]) -> list[int]:
+    """Parse hex strings of at most 16 digits into integers with one kernel call over a shared buffer."""
+    if not values:
+        return []
+    digits = np.frombuffer("".join(value.rjust(16, "0") for value in values).encode("ascii"), dtype=np.uint8)
+    return _fold_hex_rows(digits.reshape(-1, 16)).tolist()
+
+
+def _stable_int_id(value: str) -> int:
+    """Hash ``value`` to a 63-bit integer ID with XXH3-64, which unlike ``hash()`` is the same in every process."""
+    return xxhash.xxh3_64_intdigest(value.encode("utf-8")) & 0x7FFFFFFFFFFFFFFF
+
+
+def _id_content_hash(document) -> str:
+    """Use the 128-bit XXH3 hash of content for ID, which Qdrant accepts as a UUID."""
+    content = document.page_content.encode("utf-8")
+    return xxhash.xxh3_128_hexdigest(content)
+
+
+def _id_source_path(document) -> str:
+    """Use a hash of the source path from metadata."""
+    source = document.metadata.get("source", "")
+    if source:
+        return xxhash.xxh3_128_hexdigest(source.encode("utf-8"))
+    return str(uuid.uuid4())
+
+
+def _id_etag(document) -> int:
+    """Use Azure Blob etag if available, converted to a safe integer."""
+    etag = document.metadata.get("etag", "")
+    if etag:
+        # Clean etag: remove quotes, handle hex prefixes
+        cleaned_etag = _ETAG_STRIP_RE.sub("", etag)
+
+        # Convert hex etag to integer, but ensure it stays within 64-bit bounds
+        if _HEX_RE.fullmatch(cleaned_etag):
+            try:
+                # Convert hex to integer, but keep it within safe range
+                hex_value = int(cleaned_etag, 16)
+                # Check if it fits in 64-bit unsigned integer range (0 to 2^64-1)
+                if 0 < hex_value <= (2**64 - 1):
+                    return hex_value
+                else:
+                    # If too large, hash the etag to get a safe integer
+                    return _stable_int_id(etag)
+            except (ValueError, OverflowError):
+                # If conversion fails, hash the etag
+                return _stable_int_id(etag)
+        else:
+            # If etag is not hex, hash it to get an integer
+            return _stable_int_id(etag)
+
+    # Fallback to UUID converted to integer if no etag
+    return uuid.uuid4().int & ((1 << 63) - 1)
+
+
+def _id_checksum(document) -> int:
+    """Use Azure Blob checksum if available, converted to a safe integer."""
+    checksum = document.metadata.get("checksum", "")
+    if checksum:
+        # A hex digest is already uniformly distributed, so keep its low 63 bits rather than hashing it again
+        if _HEX_RE.fullmatch(checksum):
+            point_id = int(checksum[-16:], 16) & 0x7FFFFFFFFFFFFFFF
+            if point_id:
+                return point_id
+        # Hash any other checksum format to keep the ID in the 63-bit range
+        return _stable_int_id(checksum)
+    return uuid.uuid4().int & ((1 << 63) - 1)
+
+
+def _id_auto_uuid(document) -> str:
+    """Always generate a new UUID, sent to Qdrant as-is (useful for append mode)."""
+    return str(uuid.uuid4())
+
+
+# ID generator per id_strategy option, resolved once per batch instead of per document
+_ID_STRATEGIES = {
+    "content_hash": _id_content_hash,
+    "source_path": _id_source_path,
+    "etag": _id_etag,
+    "checksum": _id_checksum,
+    "auto_uuid": _id_auto_uuid,
+}
+
+
+def _etag_ids_bulk(documents: list) -> list:
+    """Vectorised ``etag`` strategy: parse every short hex etag of the batch in one pass.
+
+    Etags that are missing, not hex, longer than 16 digits or zero go through ``_id_etag``.
+    """
+    cleaned = [_ETAG_STRIP_RE.sub("", doc.metadata.get("etag") or "") for doc in documents]
+    parsable = [i for i, etag in enumerate(cleaned) if len(etag) <= 16 and _HEX_RE.fullmatch(etag)]
+    ids = [None] * len(documents)
+    for i, value in zip(parsable, _hex_to_uint64([cleaned[i] for i in parsable]), strict=True):
+        ids[i] = value or None
+    return [_id_etag(doc) if point_id is None else point_id for doc, point_id in zip(documents, ids, strict=True)]
+
+
+def _checksum_ids_bulk(documents: list) -> list:
+    """Vectorised ``checksum`` strategy: parse the last 16 digits of every hex checksum of the batch in one pass.
+
+    Checksums that are missing, not hex or whose low 63 bits are zero go through ``_id_checksum``.
+    """
+    checksums = [doc.metadata.get("checksum") or "" for doc in documents]
+    parsable = [i for i, checksum in enumerate(checksums) if checksum and _HEX_RE.fullmatch(checksum)]
+    ids = [None] * len(documents)
+    for i, value in zip(parsable, _hex_to_uint64([checksums[i][-16:] for i in parsable]), strict=True):
+        ids[i] = (value & 0x7FFFFFFFFFFFFFFF) or None
+    return [_id_checksum(doc) if point_id is None else point_id for doc, point_id in zip(documents, ids, strict=True)]
+
+
+def _encode_batch(texts: list[str]) -> list:
+    """UTF-8 encode a batch of strings, returning one bytes-like object per string.
+
+    ASCII strings, the common case for paths and markdown, are encoded with a single call into one
+    contiguous buffer and returned as zero-copy views of it. Only the non-ASCII strings of a batch
+    are encoded one by one.
+    """
+    # str.isascii is a flag check for strings CPython already stores as ASCII
+    ascii_texts = [text for text in texts if text.isascii()]
+    if not ascii_texts:
+        return [text.encode("utf-8") for text in texts]
+    buffer = memoryview("".join(ascii_texts).encode("ascii"))
+    offsets = itertools.accumulate(map(len, ascii_texts), initial=0)
+    views = (buffer[start:end] for start, end in itertools.pairwise(offsets))
+    if len(ascii_texts) == len(texts):
+        return list(views)
+    return [next(views) if text.isascii() else text.encode("utf-8") for text in texts]
+
+
+def _content_hash_ids_bulk(documents: list) -> list:
+    """Batch ``content_hash`` strategy over contents encoded once with ``_encode_batch``.
+
+    Each distinct content is encoded and hashed once, so repeated chunks such as boilerplate headers
+    share one digest.
+    """
+    texts = [doc.page_content for doc in documents]
+    unique_texts = list(dict.fromkeys(texts))
+    digests = [xxhash.xxh3_128_hexdigest(content) for content in _encode_batch(unique_texts)]
+    if len(unique_texts) == len(texts):
+        return digests
+    digests_by_text = dict(zip(unique_texts, digests, strict=True))
+    return [digests_by_text[text] for text in texts]
+
+
+def _source_path_ids_bulk(documents: list) -> list:
+    """Batch ``source_path`` strategy over sources encoded once with ``_encode_batch``."""
+    sources = [doc.metadata.get("source", "") for doc in documents]
+    encoded = iter(_encode_batch([source for source in sources if source]))
+    return [xxhash.xxh3_128_hexdigest(next(encoded)) if source else str(uuid.uuid4()) for source in sources]
+
+
+# Batch ID generators, returning the same IDs as the matching _ID_STRATEGIES entry per document
+_BULK_ID_STRATEGIES = {
+    "content_hash": _content_hash_ids_bulk,
+    "source_path": _source_path_ids_bulk,
+    "etag": _etag_ids_bulk,
+    "checksum": _checksum_ids_bulk,
+}
+
+
+def _point_id_key(point_id) -> str:
+    """Return the hyphenated UUID or decimal form of ``point_id``, so generated and stored IDs compare equal.
+
+    Remote servers report UUIDs hyphenated while local ``path`` storage returns them as stored, so IDs
+    from both sides of a comparison go through this function.
+    """
+    if isinstance(point_id, str):
+        try:
+            return str(uuid.UUID(point_id))
+        except ValueError:
+            return point_id
+    return str(point_id)
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion, also when called from inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
 
 
 class YborQdrantComponent(LCVectorStoreComponent):
@@ -65,10 +337,51 @@ class YborQdrantComponent(LCVectorStoreComponent):
             advanced=True,
         ),
         BoolInput(
+            name="skip_unchanged",
+            display_name="Skip Unchanged Documents",
+            value=False,
+            info="In upsert mode with the content_hash, etag or checksum strategy: documents whose point ID already "
+            "exists are not re-embedded or re-uploaded. Their vectors, payload and metadata stay as stored, so leave "
+            "this off after changing the embedding model, payload keys or metadata.",
+            advanced=True,
+        ),
+        IntInput(
+            name="upload_batch_size",
+            display_name="Upload Batch Size",
+            info="Number of points sent to Qdrant per upload request",
+            value=_DEFAULT_UPLOAD_BATCH_SIZE,
+            advanced=True,
+        ),
+        IntInput(
+            name="upload_parallel",
+            display_name="Upload Parallelism",
+            info="Number of upload requests sent to Qdrant concurrently",
+            value=8,
+            advanced=True,
+        ),
+        BoolInput(
+            name="wait_for_indexing",
+            display_name="Wait for Indexing",
+            value=True,
+            info="Wait until the final upload batch is applied before returning, so the points are searchable "
+            "right away. Earlier batches never wait.",
+            advanced=True,
+        ),
+        BoolInput(
+            name="quantize_vectors",
+            display_name="Quantize Vectors",
+            value=True,
+            info="Create new collections with int8 scalar quantization: searches scan quantized vectors kept in RAM "
+            "and rescore with the original vectors, which are stored on disk. Existing collections are not changed.",
+            advanced=True,
+        ),
+        DropdownInput(
             name="prefer_grpc",
             display_name="Prefer gRPC",
-            value=False,
-            info="Use gRPC connection (supports TLS/SSL better than HTTP). Recommended when using API keys with remote servers.",
+            options=["Auto", "Yes", "No"],
+            value="Auto",
+            info="Use gRPC connection (supports TLS/SSL better than HTTP). Auto uses gRPC when an API key is set and "
+            "HTTP otherwise; choose No for servers that are only reachable over HTTP.",
             advanced=True,
         ),
         *LCVectorStoreComponent.inputs,
@@ -82,204 +395,276 @@ class YborQdrantComponent(LCVectorStoreComponent):
         ),
     ]
 
-    def _generate_point_id(self, document, strategy: str):
-        """Generate a deterministic ID based on the chosen strategy."""
-        if strategy == "content_hash":
-            # Use MD5 hash of content for ID
-            content = document.page_content.encode("utf-8")
-            return hashlib.md5(content).hexdigest()
-
-        elif strategy == "source_path":
-            # Use source path from metadata
-            source = document.metadata.get("source", "")
-            if source:
-                return hashlib.md5(source.encode("utf-8")).hexdigest()
-            return str(uuid.uuid4())
-
-        elif strategy == "etag":
-            # Use Azure Blob etag if available, convert to safe integer
-            etag = document.metadata.get("etag", "")
-            if etag:
-                # Clean etag: remove quotes, handle hex prefixes
-                cleaned_etag = etag.replace('"', "").replace("0x", "").replace("0X", "")
-
-                # Convert hex etag to integer, but ensure it stays within 64-bit bounds
-                if len(cleaned_etag) > 0 and all(c in "0123456789abcdefABCDEF" for c in cleaned_etag):
-                    try:
-                        # Convert hex to integer, but keep it within safe range
-                        hex_value = int(cleaned_etag, 16)
-                        # Check if it fits in 64-bit unsigned integer range (0 to 2^64-1)
-                        if 0 < hex_value <= (2**64 - 1):
-                            return hex_value
-                        else:
-                            # If too large, hash the etag to get a safe integer
-                            return abs(hash(etag)) % (2**63 - 1)
-                    except (ValueError, OverflowError):
-                        # If conversion fails, hash the etag
-                        return abs(hash(etag)) % (2**63 - 1)
-                else:
-                    # If etag is not hex, hash it to get an integer
-                    return abs(hash(etag)) % (2**63 - 1)
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # (collection name, vector size) pairs known to exist on _ensured_collections_client, so repeated
+        # builds skip the lookup
+        self._ensured_collections: set[tuple[str, int]] = set()
+        self._ensured_collections_client: QdrantClient | None = None
+        # QdrantClient reused across builds while the connection settings stay the same
+        self._qdrant_client: QdrantClient | None = None
+        self._qdrant_client_key: tuple | None = None
+        self._qdrant_client_lock = threading.Lock()
 
-            # Fallback to UUID converted to integer if no etag
-            return abs(hash(str(uuid.uuid4()))) % (2**63 - 1)
+    def _generate_point_id(self, document, strategy: str):
+        """Generate a deterministic ID based on the chosen strategy; a thin wrapper over ``_ID_STRATEGIES``."""
+        return _ID_STRATEGIES.get(strategy, _id_auto_uuid)(document)
 
-        elif strategy == "checksum":
-            # Use Azure Blob checksum if available, convert to safe integer
-            checksum = document.metadata.get("checksum", "")
-            if checksum:
-                # Always hash the checksum to ensure it fits in 64-bit range
-                # This ensures consistent, bounded integers regardless of checksum format
-                return abs(hash(checksum)) % (2**63 - 1)
-            return abs(hash(str(uuid.uuid4()))) % (2**63 - 1)
+    def _generate_point_ids_bulk(self, documents: list, strategy: str) -> list:
+        """Generate IDs for a whole batch of documents, resolving the strategy once.
 
-        elif strategy == "auto_uuid":
-            # Always generate new UUID as integer (useful for append mode)
-            return abs(hash(str(uuid.uuid4()))) % (2**63 - 1)
-
-        else:
-            return abs(hash(str(uuid.uuid4()))) % (2**63 - 1)
+        Returns the same IDs as calling ``_generate_point_id`` for each document in turn.
+        """
+        if strategy in _BULK_ID_STRATEGIES and len(documents) >= _VECTORIZE_MIN_BATCH:
+            return _BULK_ID_STRATEGIES[strategy](documents)
+        generate_id = _ID_STRATEGIES.get(strategy, _id_auto_uuid)
+        return [generate_id(doc) for doc in documents]
 
     def _create_collection_if_not_exists(self, client: QdrantClient, collection_name: str, vector_size: int):
         """Create collection if it doesn't exist."""
-        try:
-            client.get_collection(collection_name)
+        if client is not self._ensured_collections_client:
+            # Collections seen through another client may live on another server
+            self._ensured_collections.clear()
+            self._ensured_collections_client = client
+        elif (collection_name, vector_size) in self._ensured_collections:
+            return
+
+        if client.collection_exists(collection_name):
             self.log(f"Collection '{collection_name}' already exists")
-        except Exception:
+        else:
             self.log(f"Creating collection '{collection_name}' with vector size {vector_size}")
 
-            distance_mapping = {
-                "Cosine": Distance.COSINE,
-                "Euclidean": Distance.EUCLID,
-                "Dot Product": Distance.DOT,
-            }
+            quantization_config = None
+            if self.quantize_vectors:
+                quantization_config = ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8, quantile=_QUANTIZATION_QUANTILE, always_ram=True
+                    )
+                )
 
             client.create_collection(
                 collection_name=collection_name,
                 vectors_config=VectorParams(
                     size=vector_size,
-                    distance=distance_mapping.get(self.distance_func, Distance.COSINE),
+                    distance=_DISTANCE_FUNCS.get(self.distance_func, Distance.COSINE),
+                    # The quantized copy serves searches from RAM; the originals are only read to rescore
+                    on_disk=bool(self.quantize_vectors),
                 ),
+                quantization_config=quantization_config,
             )
 
-    def _get_existing_point_ids(self, client: QdrantClient, collection_name: str) -> set:
-        """Get all existing point IDs in the collection."""
+        self._ensured_collections.add((collection_name, vector_size))
+
+    def _collection_exists(self, client: QdrantClient, collection_name: str) -> bool:
+        """Return whether the collection exists, answering from ``_ensured_collections`` when it can."""
+        if client is self._ensured_collections_client and any(
+            name == collection_name for name, _ in self._ensured_collections
+        ):
+            return True
+        return client.collection_exists(collection_name)
+
+    def _forget_collection(self, collection_name: str):
+        """Drop every cached ``_ensured_collections`` entry for ``collection_name``, whatever its vector size."""
+        self._ensured_collections = {entry for entry in self._ensured_collections if entry[0] != collection_name}
+
+    def _get_existing_point_ids(
+        self, client: QdrantClient, collection_name: str, candidate_ids: list | None = None
+    ) -> set:
+        """Get existing point IDs in the collection.
+
+        When ``candidate_ids`` is given, only those IDs are looked up with ``retrieve``, in requests of
+        at most ``_SCROLL_PAGE_SIZE`` IDs. This costs O(len(candidate_ids)) regardless of the collection
+        size, and the returned set never holds more than the candidates. Otherwise the whole collection
+        is scrolled in pages of ``_SCROLL_PAGE_SIZE`` IDs, which is O(collection size) and best kept
+        for full dumps.
+        """
         try:
-            # Scroll through all points to get their IDs
+            if candidate_ids is not None:
+                existing_ids = set()
+                for start in range(0, len(candidate_ids), _SCROLL_PAGE_SIZE):
+                    points = client.retrieve(
+                        collection_name=collection_name,
+                        ids=candidate_ids[start : start + _SCROLL_PAGE_SIZE],
+                        with_payload=False,
+                        with_vectors=False,
+                    )
+                    existing_ids.update(_point_id_key(point.id) for point in points)
+                return existing_ids
+
+            # Scroll through all points to get their IDs, adding each page to the set in one update
             existing_ids = set()
             offset = None
-
             while True:
-                points, next_offset = client.scroll(
+                points, offset = client.scroll(
                     collection_name=collection_name,
-                    limit=100,
+                    limit=_SCROLL_PAGE_SIZE,
                     offset=offset,
                     with_payload=False,
                     with_vectors=False,
                 )
-
-                for point in points:
-                    existing_ids.add(str(point.id))
-
-                if next_offset is None:
-                    break
-                offset = next_offset
-
-            return existing_ids
+                existing_ids.update(_point_id_key(point.id) for point in points)
+                if offset is None:
+                    return existing_ids
         except Exception as e:
             self.log(f"Error getting existing point IDs: {e}")
             return set()
 
+    def _embed_documents(self, documents: list) -> list:
+        """Embed document contents, sending each distinct text to the embedding model only once."""
+        texts = [doc.page_content for doc in documents]
+        unique_texts = list(dict.fromkeys(texts))
+        vectors_by_text = dict(zip(unique_texts, self.embedding.embed_documents(unique_texts), strict=True))
+        return [vectors_by_text[text] for text in texts]
+
+    def _upload_points(self, client: QdrantClient, collection_name: str, ids: list, vectors: list, payloads: list):
+        """Upload points in parallel batches, pausing indexing while a bulk upload runs."""
+        indexing_threshold = None
+        if len(ids) >= _BULK_UPLOAD_SIZE:
+            try:
+                collection_info = client.get_collection(collection_name)
+                indexing_threshold = collection_info.config.optimizer_config.indexing_threshold
+                if indexing_threshold is None:
+                    indexing_threshold = _DEFAULT_INDEXING_THRESHOLD
+                client.update_collection(collection_name, optimizers_config=OptimizersConfigDiff(indexing_threshold=0))
+            except Exception as e:
+                self.log(f"Could not pause indexing for bulk upload: {e}")
+                indexing_threshold = None
+
+        try:
+            if self.path:
+                # Local storage can only be opened by one client at a time, so stay on the synchronous one
+                client.upload_collection(
+                    collection_name=collection_name,
+                    vectors=vectors,
+                    payload=payloads,
+                    ids=ids,
+                    batch_size=int(self.upload_batch_size or _DEFAULT_UPLOAD_BATCH_SIZE),
+                    wait=bool(self.wait_for_indexing),
+                )
+            else:
+                _run_coroutine(self._async_upload(collection_name, ids, vectors, payloads))
+        except Exception:
+            # The collection may have been deleted outside this component; look it up again on the next build
+            self._forget_collection(collection_name)
+            raise
+        finally:
+            if indexing_threshold is not None:
+                client.update_collection(
+                    collection_name,
+                    optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold),
+                )
+
+    async def _async_upload(self, collection_name: str, ids: list, vectors: list, payloads: list):
+        """Upsert batches of points concurrently so request latency overlaps across batches.
+
+        Points are sent as column-oriented ``Batch`` objects built from slices of the parallel
+        ``ids``/``vectors``/``payloads`` lists, so no per-point ``PointStruct`` is created.
+        """
+        batch_size = max(int(self.upload_batch_size or _DEFAULT_UPLOAD_BATCH_SIZE), 1)
+        sem = asyncio.Semaphore(max(int(self.upload_parallel or 1), 1))
+        client = AsyncQdrantClient(**self._get_server_kwargs())
+
+        async def _upsert(start: int, wait: bool):
+            end = start + batch_size
+            batch = Batch(ids=ids[start:end], vectors=vectors[start:end], payloads=payloads[start:end])
+            async with sem:
+                await client.upsert(collection_name=collection_name, points=batch, wait=wait)
+
+        starts = range(0, len(ids), batch_size)
+        try:
+            # Only the final batch may wait: Qdrant applies updates in order, so once it is applied all are
+            await asyncio.gather(*(_upsert(start, False) for start in starts[:-1]))
+            if starts:
+                await _upsert(starts[-1], bool(self.wait_for_indexing))
+        finally:
+            await client.close()
+
     def _perform_upsert_operation(self, client: QdrantClient, collection_name: str, documents: list):
         """Perform upsert operation - update existing points or add new ones."""
         self.log(f"🔄 UPSERT MODE: Processing {len(documents)} documents with ID strategy: {self.id_strategy}")
 
-        # Get embedding dimensions from first document
-        first_embedding = self.embedding.embed_query(documents[0].page_content)
-        vector_size = len(first_embedding)
+        # Generate deterministic IDs for the whole batch
+        id_strategy = self.id_strategy
+        try:
+            ids = self._generate_point_ids_bulk(documents, id_strategy)
+        except Exception as e:
+            self.log(f"❌ Error preparing point IDs in bulk: {e}; retrying per document")
+            generate_id = _ID_STRATEGIES.get(id_strategy, _id_auto_uuid)
+            ids = []
+            for i, doc in enumerate(documents):
+                try:
+                    ids.append(generate_id(doc))
+                except Exception as e:
+                    self.log(f"❌ Error preparing point {i}: {e}")
+                    # Fall back to a random UUID
+                    fallback_id = str(uuid.uuid4()).replace("-", "")
+                    self.log(f"🔄 Used fallback ID: {fallback_id[:12]}... for doc {i}")
+                    ids.append(fallback_id)
+
+        # Look up only this batch's IDs and drop documents that are already stored unchanged
+        if (
+            self.skip_unchanged
+            and id_strategy in _CONTENT_DERIVED_STRATEGIES
+            and self._collection_exists(client, collection_name)
+        ):
+            existing_ids = self._get_existing_point_ids(
+                client, collection_name, [point_id for point_id in ids if point_id]
+            )
+            if existing_ids:
+                kept = [i for i, point_id in enumerate(ids) if _point_id_key(point_id) not in existing_ids]
+                if len(kept) < len(ids):
+                    self.log(f"⏭️ Skipping {len(ids) - len(kept)} unchanged documents already in the collection")
+                    documents = [documents[i] for i in kept]
+                    ids = [ids[i] for i in kept]
+            if not documents:
+                self.log("✅ Upsert completed. All documents are already up to date")
+                return
+
+        # Embed all documents in one batch; the first vector also gives the collection dimensions
+        vectors = self._embed_documents(documents)
 
         # Ensure collection exists
-        self._create_collection_if_not_exists(client, collection_name, vector_size)
-
-        # Prepare points for upsert
-        points = []
-        for i, doc in enumerate(documents):
-            try:
-                # Generate deterministic ID
-                point_id = self._generate_point_id(doc, self.id_strategy)
-
-                # Validate point ID
-                if not point_id or len(str(point_id)) == 0:
-                    self.log(f"⚠️ Generated empty ID for doc {i}, using fallback UUID")
-                    point_id = str(uuid.uuid4()).replace("-", "")
-
-                # Get embedding for document
-                vector = self.embedding.embed_query(doc.page_content)
-
-                # Create point with metadata
-                payload = {
-                    self.content_payload_key: doc.page_content,
-                    self.metadata_payload_key: doc.metadata,
-                }
-
-                point = PointStruct(
-                    id=point_id,
-                    vector=vector,
-                    payload=payload,
-                )
-                points.append(point)
-
-                # Log with more details for debugging
+        self._create_collection_if_not_exists(client, collection_name, len(vectors[0]))
+
+        # Prepare payloads for upsert
+        content_key, metadata_key = self.content_payload_key, self.metadata_payload_key
+        payloads = []
+        for i, (doc, point_id) in enumerate(zip(documents, ids, strict=True)):
+            # Validate point ID
+            if not point_id or len(str(point_id)) == 0:
+                self.log(f"⚠️ Generated empty ID for doc {i}, using fallback UUID")
+                point_id = ids[i] = str(uuid.uuid4()).replace("-", "")
+
+            # Log a sample of points with more details for debugging
+            if _is_log_sample(i):
                 source = doc.metadata.get("source", "unknown")
-                etag = doc.metadata.get("etag", "no-etag")
-                checksum = doc.metadata.get("checksum", "no-checksum")
                 self.log(f"📝 Prepared point ID: {point_id} (type: {type(point_id).__name__}) from source: {source}")
-                if self.id_strategy == "etag":
-                    self.log(f"   📋 ETag: {etag}")
-                elif self.id_strategy == "checksum":
-                    self.log(f"   📋 Checksum: {checksum}")
+                if id_strategy == "etag":
+                    self.log(f"   📋 ETag: {doc.metadata.get('etag', 'no-etag')}")
+                elif id_strategy == "checksum":
+                    self.log(f"   📋 Checksum: {doc.metadata.get('checksum', 'no-checksum')}")
 
-            except Exception as e:
-                self.log(f"❌ Error preparing point {i}: {e}")
-                # Create fallback point with UUID
-                fallback_id = str(uuid.uuid4()).replace("-", "")
-                try:
-                    vector = self.embedding.embed_query(doc.page_content)
-                    payload = {
-                        self.content_payload_key: doc.page_content,
-                        self.metadata_payload_key: doc.metadata,
-                    }
-                    point = PointStruct(
-                        id=fallback_id,
-                        vector=vector,
-                        payload=payload,
-                    )
-                    points.append(point)
-                    self.log(f"🔄 Used fallback ID: {fallback_id[:12]}... for doc {i}")
-                except Exception as e2:
-                    self.log(f"❌ Failed to create fallback point {i}: {e2}")
-                    continue
+            payloads.append({content_key: doc.page_content, metadata_key: doc.metadata})
+
+        self.log(f"📝 Prepared {len(ids)} points")
 
         # Perform upsert operation
-        operation_info = client.upsert(
-            collection_name=collection_name,
-            points=points,
-            wait=True,
-        )
+        self._upload_points(client, collection_name, ids, vectors, payloads)
 
-        self.log(f"✅ Upsert completed. Operation info: {operation_info}")
+        self.log(f"✅ Upsert completed. Uploaded {len(ids)} points")
 
     def _perform_overwrite_operation(self, client: QdrantClient, collection_name: str, documents: list):
         """Perform overwrite operation - replace specified documents or entire collection."""
         self.log(f"🔄 OVERWRITE MODE: Processing {len(documents)} documents")
 
-        # Get embedding dimensions from first document
-        first_embedding = self.embedding.embed_query(documents[0].page_content)
-        vector_size = len(first_embedding)
+        # Embed all documents in one batch; the first vector also gives the collection dimensions
+        vectors = self._embed_documents(documents)
+        vector_size = len(vectors[0])
 
         if not self.preserve_existing:
             # Delete and recreate entire collection
             self.log("🗑️ Deleting entire collection for complete overwrite")
+            self._forget_collection(collection_name)
             try:
                 client.delete_collection(collection_name)
             except Exception as e:
@@ -292,87 +677,58 @@ class YborQdrantComponent(LCVectorStoreComponent):
             self._create_collection_if_not_exists(client, collection_name, vector_size)
 
         # Prepare points with deterministic IDs (so we can overwrite specific documents)
-        points = []
-        for doc in documents:
-            point_id = self._generate_point_id(doc, self.id_strategy)
-            vector = self.embedding.embed_query(doc.page_content)
-
-            payload = {
-                self.content_payload_key: doc.page_content,
-                self.metadata_payload_key: doc.metadata,
-            }
-
-            point = PointStruct(
-                id=point_id,
-                vector=vector,
-                payload=payload,
-            )
-            points.append(point)
+        ids = self._generate_point_ids_bulk(documents, self.id_strategy)
+        content_key, metadata_key = self.content_payload_key, self.metadata_payload_key
+        payloads = []
+        for i, (doc, point_id) in enumerate(zip(documents, ids, strict=True)):
+            payloads.append({content_key: doc.page_content, metadata_key: doc.metadata})
+
+            if _is_log_sample(i):
+                self.log(
+                    f"📝 Prepared overwrite point ID: {str(point_id)[:8]}... from source: {doc.metadata.get('source', 'unknown')}"
+                )
 
-            self.log(
-                f"📝 Prepared overwrite point ID: {point_id[:8]}... from source: {doc.metadata.get('source', 'unknown')}"
-            )
+        self.log(f"📝 Prepared {len(ids)} overwrite points")
 
         # Perform upsert (which will overwrite existing points with same IDs)
-        operation_info = client.upsert(
-            collection_name=collection_name,
-            points=points,
-            wait=True,
-        )
+        self._upload_points(client, collection_name, ids, vectors, payloads)
 
-        self.log(f"✅ Overwrite completed. Operation info: {operation_info}")
+        self.log(f"✅ Overwrite completed. Uploaded {len(ids)} points")
 
     def _perform_append_operation(self, client: QdrantClient, collection_name: str, documents: list):
         """Perform append operation - always add as new points with unique IDs."""
         self.log(f"🔄 APPEND MODE: Adding {len(documents)} documents as new points")
 
-        # Get embedding dimensions from first document
-        first_embedding = self.embedding.embed_query(documents[0].page_content)
-        vector_size = len(first_embedding)
+        # Embed all documents in one batch; the first vector also gives the collection dimensions
+        vectors = self._embed_documents(documents)
 
         # Ensure collection exists
-        self._create_collection_if_not_exists(client, collection_name, vector_size)
+        self._create_collection_if_not_exists(client, collection_name, len(vectors[0]))
 
         # Prepare points with unique UUIDs (always new points)
-        points = []
-        for doc in documents:
+        content_key, metadata_key = self.content_payload_key, self.metadata_payload_key
+        ids = []
+        payloads = []
+        for i, doc in enumerate(documents):
             # Always generate new UUID for append mode
             point_id = str(uuid.uuid4())
-            vector = self.embedding.embed_query(doc.page_content)
-
-            payload = {
-                self.content_payload_key: doc.page_content,
-                self.metadata_payload_key: doc.metadata,
-            }
+            ids.append(point_id)
+            payloads.append({content_key: doc.page_content, metadata_key: doc.metadata})
 
-            point = PointStruct(
-                id=point_id,
-                vector=vector,
-                payload=payload,
-            )
-            points.append(point)
+            if _is_log_sample(i):
+                self.log(
+                    f"📝 Prepared new point ID: {point_id[:8]}... from source: {doc.metadata.get('source', 'unknown')}"
+                )
 
-            self.log(
-                f"📝 Prepared new point ID: {point_id[:8]}... from source: {doc.metadata.get('source', 'unknown')}"
-            )
+        self.log(f"📝 Prepared {len(ids)} new points")
 
         # Perform upsert with unique IDs (effectively append)
-        operation_info = client.upsert(
-            collection_name=collection_name,
-            points=points,
-            wait=True,
-        )
+        self._upload_points(client, collection_name, ids, vectors, payloads)
 
-        self.log(f"✅ Append completed. Operation info: {operation_info}")
-
-    @check_cached_vector_store
-    def build_vector_store(self) -> Qdrant:
-        qdrant_kwargs = {
-            "collection_name": self.collection_name,
-            "content_payload_key": self.content_payload_key,
-            "metadata_payload_key": self.metadata_payload_key,
-        }
+        self.log(f"✅ Append completed. Uploaded {len(ids)} points")
 
+    def _get_server_kwargs(self) -> dict:
+        """Build the connection arguments shared by the sync and async Qdrant clients."""
         server_kwargs = {
             "host": self.host or None,
             "port": int(self.port),
@@ -387,10 +743,38 @@ class YborQdrantComponent(LCVectorStoreComponent):
         # Remove None values
         server_kwargs = {k: v for k, v in server_kwargs.items() if v is not None}
 
-        # Add gRPC preference if specified (helps with TLS/SSL and API key warnings)
-        if self.prefer_grpc:
+        # Add gRPC preference if specified (helps with TLS/SSL and API key warnings). Remote servers
+        # secured with an API key default to gRPC: protobuf encoding is much cheaper than JSON per point.
+        # Flows saved while this was a checkbox still hold True or False, read as Yes and Auto.
+        prefer_grpc = self.prefer_grpc
+        if prefer_grpc is True or prefer_grpc == "Yes" or (prefer_grpc != "No" and self.api_key):
             server_kwargs["prefer_grpc"] = True
 
+        return server_kwargs
+
+    def _get_client(self) -> QdrantClient:
+        """Return a QdrantClient for the current connection settings, reusing the cached one when they match."""
+        server_kwargs = self._get_server_kwargs()
+        client_key = tuple(sorted(server_kwargs.items()))
+        with self._qdrant_client_lock:
+            if self._qdrant_client is None or self._qdrant_client_key != client_key:
+                if self._qdrant_client is not None:
+                    # Release the old connections; local storage also stays locked until its client is closed
+                    self._qdrant_client.close()
+                self._qdrant_client = QdrantClient(**server_kwargs)
+                self._qdrant_client_key = client_key
+                # Collections ensured on the previous connection say nothing about this one
+                self._ensured_collections.clear()
+            return self._qdrant_client
+
+    @check_cached_vector_store
+    def build_vector_store(self) -> Qdrant:
+        qdrant_kwargs = {
+            "collection_name": self.collection_name,
+            "content_payload_key": self.content_payload_key,
+            "metadata_payload_key": self.metadata_payload_key,
+        }
+
         # Convert DataFrame to Data if needed using parent's method
         self.ingest_data = self._prepare_ingest_data()
 
@@ -405,8 +789,8 @@ class YborQdrantComponent(LCVectorStoreComponent):
             msg = "Invalid embedding object"
             raise TypeError(msg)
 
-        # Create QdrantClient for direct operations
-        client = QdrantClient(**server_kwargs)
+        # Get QdrantClient for direct operations
+        client = self._get_client()
 
         if documents:
             self.log(f"🚀 Starting {self.operation_mode.upper()} operation with {len(documents)} documents")
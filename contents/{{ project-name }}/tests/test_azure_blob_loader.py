@@ -1,10 +1,47 @@
 """Tests for AzureBlobLoader component."""
 
-from unittest.mock import MagicMock, Mock, patch
+import asyncio
+import hashlib
+import json
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
-from components.data_loaders.AzureBlobLoader import AzureBlobLoader
+from components.data_loaders.AzureBlobLoader import AzureBlobLoader, _md5_batch, commit_etag_cache
+
+
+class _AsyncIterator:
+    """Minimal async iterator mimicking the paged result of ``list_blobs``."""
+
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _mock_blob(name, etag=None, content_md5=None):
+    """Create a mocked blob listing entry."""
+    blob = Mock()
+    blob.name = name
+    blob.etag = etag
+    blob.content_settings.content_md5 = content_md5
+    return blob
+
+
+def _mock_download(content):
+    """Create a mocked async download stream returning ``content``."""
+    download = Mock()
+    download.size = len(content)
+    download.readall = AsyncMock(return_value=content)
+    download.readinto = AsyncMock(side_effect=lambda stream: stream.write(content))
+    return download
 
 
 class TestAzureBlobLoader:
@@ -19,6 +56,11 @@ class TestAzureBlobLoader:
         comp.connection_string = (
             "DefaultEndpointsProtocol=https;AccountName=test;AccountKey=test==;EndpointSuffix=core.windows.net"
         )
+        comp.max_concurrency = 16
+        comp.download_concurrency = 8
+        comp.download_chunk_size = 16 * 1024 * 1024
+        comp.cache_path = ""
+        comp.defer_cache_commit = False
         comp.log = MagicMock()
         return comp
 
@@ -35,37 +77,28 @@ class TestAzureBlobLoader:
         with pytest.raises(RuntimeError, match="Azure connection string not passed"):
             component.build()
 
-    @patch("azure.storage.blob.BlobServiceClient")
+    @patch("azure.storage.blob.aio.BlobServiceClient")
     def test_build_with_markdown_files(self, mock_blob_service, component):
         """Test building with markdown files from blob storage."""
         # Mock the blob service client
-        mock_service_client = Mock()
-        mock_container_client = Mock()
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
         mock_blob_service.from_connection_string.return_value = mock_service_client
         mock_service_client.get_container_client.return_value = mock_container_client
 
         # Create mock blobs
-        mock_blob1 = Mock()
-        mock_blob1.name = "test1.md"
-        mock_blob1.etag = '"0x8DCABCDEF123456"'
-
-        mock_blob2 = Mock()
-        mock_blob2.name = "test2.md"
-        mock_blob2.etag = '"0x8DCABCDEF789ABC"'
+        mock_blob1 = _mock_blob("test1.md", '"0x8DCABCDEF123456"')
+        mock_blob2 = _mock_blob("test2.md", '"0x8DCABCDEF789ABC"')
 
         # Mock blob content
-        content1 = b"# Test Document 1\nThis is test content."
-        content2 = b"# Test Document 2\nThis is more test content."
-
-        mock_download1 = Mock()
-        mock_download1.readall.return_value = content1
-
-        mock_download2 = Mock()
-        mock_download2.readall.return_value = content2
+        downloads = {
+            "test1.md": _mock_download(b"# Test Document 1\nThis is test content."),
+            "test2.md": _mock_download(b"# Test Document 2\nThis is more test content."),
+        }
 
         # Setup container client mocks
-        mock_container_client.list_blobs.return_value = [mock_blob1, mock_blob2]
-        mock_container_client.download_blob.side_effect = [mock_download1, mock_download2]
+        mock_container_client.list_blobs.return_value = _AsyncIterator([mock_blob1, mock_blob2])
+        mock_container_client.download_blob = AsyncMock(side_effect=lambda name, **kwargs: downloads[name])
 
         # Execute build
         result = component.build()
@@ -75,91 +108,74 @@ class TestAzureBlobLoader:
         assert all(hasattr(doc, "text") for doc in result)
 
         # Verify service client calls
-        mock_blob_service.from_connection_string.assert_called_once()
+        mock_blob_service.from_connection_string.assert_called_once_with(
+            component.connection_string, max_chunk_get_size=16 * 1024 * 1024
+        )
         mock_service_client.get_container_client.assert_called_once_with("test-container")
         assert mock_container_client.download_blob.call_count == 2
 
-    @patch("azure.storage.blob.BlobServiceClient")
+    @patch("azure.storage.blob.aio.BlobServiceClient")
     def test_build_filters_by_suffix(self, mock_blob_service, component):
         """Test that files are filtered by suffix."""
-        mock_service_client = Mock()
-        mock_container_client = Mock()
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
         mock_blob_service.from_connection_string.return_value = mock_service_client
         mock_service_client.get_container_client.return_value = mock_container_client
 
         # Create mock blobs with different extensions
-        mock_blob_md = Mock()
-        mock_blob_md.name = "test.md"
-        mock_blob_md.etag = '"0x8DCABCDEF123456"'
-
-        mock_blob_txt = Mock()
-        mock_blob_txt.name = "test.txt"
-
-        # Mock blob content
-        content_md = b"# Test Document"
-        mock_download = Mock()
-        mock_download.readall.return_value = content_md
+        mock_blob_md = _mock_blob("test.md", '"0x8DCABCDEF123456"')
+        mock_blob_txt = _mock_blob("test.txt")
 
         # Setup container client mocks
-        mock_container_client.list_blobs.return_value = [mock_blob_md, mock_blob_txt]
-        mock_container_client.download_blob.return_value = mock_download
+        mock_container_client.list_blobs.return_value = _AsyncIterator([mock_blob_md, mock_blob_txt])
+        mock_container_client.download_blob = AsyncMock(return_value=_mock_download(b"# Test Document"))
 
         # Execute build
         result = component.build()
 
         # Should only process the .md file
         assert len(result) == 1
-        mock_container_client.download_blob.assert_called_once_with("test.md")
+        mock_container_client.download_blob.assert_called_once_with("test.md", max_concurrency=8)
 
-    @patch("azure.storage.blob.BlobServiceClient")
+    @patch("azure.storage.blob.aio.BlobServiceClient")
     def test_build_handles_unicode_decode_error(self, mock_blob_service, component):
         """Test that unicode decode errors are handled gracefully."""
-        mock_service_client = Mock()
-        mock_container_client = Mock()
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
         mock_blob_service.from_connection_string.return_value = mock_service_client
         mock_service_client.get_container_client.return_value = mock_container_client
 
         # Create mock blob
-        mock_blob = Mock()
-        mock_blob.name = "test.md"
-        mock_blob.etag = '"0x8DCABCDEF123456"'
+        mock_blob = _mock_blob("test.md", '"0x8DCABCDEF123456"')
 
         # Mock blob content with invalid UTF-8 bytes
         content = b"\xff\xfe# Invalid UTF-8"
-        mock_download = Mock()
-        mock_download.readall.return_value = content
 
         # Setup container client mocks
-        mock_container_client.list_blobs.return_value = [mock_blob]
-        mock_container_client.download_blob.return_value = mock_download
+        mock_container_client.list_blobs.return_value = _AsyncIterator([mock_blob])
+        mock_container_client.download_blob = AsyncMock(return_value=_mock_download(content))
 
         # Execute build - should not raise exception
         result = component.build()
 
         # Should still return result with decoded content (ignoring errors)
         assert len(result) == 1
+        assert result[0].text == "# Invalid UTF-8"
 
-    @patch("azure.storage.blob.BlobServiceClient")
+    @patch("azure.storage.blob.aio.BlobServiceClient")
     def test_build_includes_metadata(self, mock_blob_service, component):
         """Test that documents include correct metadata."""
-        mock_service_client = Mock()
-        mock_container_client = Mock()
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
         mock_blob_service.from_connection_string.return_value = mock_service_client
         mock_service_client.get_container_client.return_value = mock_container_client
 
         # Create mock blob
-        mock_blob = Mock()
-        mock_blob.name = "test.md"
-        mock_blob.etag = '"0x8DCABCDEF123456"'
-
-        # Mock blob content
-        content = b"# Test Document"
-        mock_download = Mock()
-        mock_download.readall.return_value = content
+        mock_blob = _mock_blob("test.md", '"0x8DCABCDEF123456"')
 
         # Setup container client mocks
-        mock_container_client.list_blobs.return_value = [mock_blob]
-        mock_container_client.download_blob.return_value = mock_download
+        mock_container_client.list_blobs.return_value = _AsyncIterator([mock_blob])
+        mock_container_client.download_blob = AsyncMock(return_value=_mock_download(b"# Test Document"))
 
         # Execute build
         result = component.build()
@@ -171,16 +187,16 @@ class TestAzureBlobLoader:
         # Check that metadata exists (structure may vary depending on Data class implementation)
         assert hasattr(doc_data, "data") or hasattr(doc_data, "metadata")
 
-    @patch("azure.storage.blob.BlobServiceClient")
+    @patch("azure.storage.blob.aio.BlobServiceClient")
     def test_build_with_empty_container(self, mock_blob_service, component):
         """Test building with empty container."""
-        mock_service_client = Mock()
-        mock_container_client = Mock()
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
         mock_blob_service.from_connection_string.return_value = mock_service_client
         mock_service_client.get_container_client.return_value = mock_container_client
 
         # Empty container
-        mock_container_client.list_blobs.return_value = []
+        mock_container_client.list_blobs.return_value = _AsyncIterator([])
 
         # Execute build
         result = component.build()
@@ -189,6 +205,175 @@ class TestAzureBlobLoader:
         assert len(result) == 0
         assert component.status == "Processed 0 files successfully."
 
+    @patch("azure.storage.blob.aio.BlobServiceClient")
+    def test_build_limits_concurrent_downloads(self, mock_blob_service, component):
+        """Test that no more than max_concurrency downloads are in flight at once."""
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
+        mock_blob_service.from_connection_string.return_value = mock_service_client
+        mock_service_client.get_container_client.return_value = mock_container_client
+
+        blobs = [_mock_blob(f"doc{i}.md") for i in range(6)]
+
+        in_flight = 0
+        peak = 0
+
+        async def download(name, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _mock_download(name.encode("utf-8"))
+
+        mock_container_client.list_blobs.return_value = _AsyncIterator(blobs)
+        mock_container_client.download_blob = AsyncMock(side_effect=download)
+        component.max_concurrency = 2
+
+        result = component.build()
+
+        assert len(result) == 6
+        assert peak == 2
+
+    @patch("azure.storage.blob.aio.BlobServiceClient")
+    def test_build_uses_server_content_md5(self, mock_blob_service, component):
+        """Test that the checksum comes from the blob properties when Azure provides one."""
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
+        mock_blob_service.from_connection_string.return_value = mock_service_client
+        mock_service_client.get_container_client.return_value = mock_container_client
+
+        server_md5 = bytearray(range(16))
+        mock_container_client.list_blobs.return_value = _AsyncIterator(
+            [_mock_blob("with_md5.md", content_md5=server_md5), _mock_blob("without_md5.md")]
+        )
+        mock_container_client.download_blob = AsyncMock(return_value=_mock_download(b"# Test Document"))
+
+        result = component.build()
+
+        checksums = {doc.data["source"]: doc.data["checksum"] for doc in result}
+        assert checksums["with_md5.md"] == server_md5.hex()
+        assert checksums["without_md5.md"] == hashlib.md5(b"# Test Document").hexdigest()
+
+    @patch("azure.storage.blob.aio.BlobServiceClient")
+    def test_build_skips_blobs_with_cached_etag(self, mock_blob_service, component, tmp_path):
+        """Test that blobs whose ETag is unchanged since the last run are not downloaded again."""
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
+        mock_blob_service.from_connection_string.return_value = mock_service_client
+        mock_service_client.get_container_client.return_value = mock_container_client
+        component.cache_path = str(tmp_path / "etags.json")
+
+        mock_container_client.list_blobs.return_value = _AsyncIterator(
+            [_mock_blob("a.md", '"0x1"'), _mock_blob("b.md", '"0x2"')]
+        )
+        mock_container_client.download_blob = AsyncMock(return_value=_mock_download(b"# Test Document"))
+        assert len(component.build()) == 2
+
+        # Second run: only b.md changed
+        mock_container_client.list_blobs.return_value = _AsyncIterator(
+            [_mock_blob("a.md", '"0x1"'), _mock_blob("b.md", '"0x3"')]
+        )
+        mock_container_client.download_blob.reset_mock()
+        result = component.build()
+
+        assert [doc.data["source"] for doc in result] == ["b.md"]
+        mock_container_client.download_blob.assert_called_once_with("b.md", max_concurrency=8)
+
+    @patch("azure.storage.blob.aio.BlobServiceClient")
+    def test_build_defers_etag_cache_until_commit(self, mock_blob_service, component, tmp_path):
+        """Test that deferred ETags only skip blobs once commit_etag_cache has been called."""
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
+        mock_blob_service.from_connection_string.return_value = mock_service_client
+        mock_service_client.get_container_client.return_value = mock_container_client
+        component.cache_path = str(tmp_path / "etags.json")
+        component.defer_cache_commit = True
+        mock_container_client.download_blob = AsyncMock(return_value=_mock_download(b"# Test Document"))
+
+        # Not committed, e.g. because the ingest failed: the blob is loaded again
+        for _ in range(2):
+            mock_container_client.list_blobs.return_value = _AsyncIterator([_mock_blob("a.md", '"0x1"')])
+            assert len(component.build()) == 1
+
+        component.commit_cache()
+        mock_container_client.list_blobs.return_value = _AsyncIterator([_mock_blob("a.md", '"0x1"')])
+
+        assert component.build() == []
+        assert not (tmp_path / "etags.json.pending").exists()
+
+    def test_commit_etag_cache_keeps_pending_etags_of_other_containers(self, tmp_path):
+        """Test that committing merges every container's pending ETags into the existing cache."""
+        cache_path = tmp_path / "etags.json"
+        cache_path.write_text(json.dumps({"docs": {"a.md": '"0x1"'}}))
+        (tmp_path / "etags.json.pending").write_text(
+            json.dumps({"docs": {"b.md": '"0x2"'}, "other": {"c.md": '"0x3"'}})
+        )
+
+        commit_etag_cache(str(cache_path))
+
+        assert json.loads(cache_path.read_text()) == {
+            "docs": {"a.md": '"0x1"', "b.md": '"0x2"'},
+            "other": {"c.md": '"0x3"'},
+        }
+        assert not (tmp_path / "etags.json.pending").exists()
+
+    @patch("azure.storage.blob.aio.BlobServiceClient")
+    def test_build_cancels_downloads_when_one_fails(self, mock_blob_service, component):
+        """Test that a failed download cancels the other in-flight downloads and raises its own error."""
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
+        mock_blob_service.from_connection_string.return_value = mock_service_client
+        mock_service_client.get_container_client.return_value = mock_container_client
+        cancelled = []
+
+        async def download(name, **kwargs):
+            if name == "bad.md":
+                raise OSError("connection reset")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+
+        mock_container_client.list_blobs.return_value = _AsyncIterator([_mock_blob("slow.md"), _mock_blob("bad.md")])
+        mock_container_client.download_blob = AsyncMock(side_effect=download)
+
+        with pytest.raises(OSError, match="connection reset"):
+            component.build()
+
+        assert cancelled == ["slow.md"]
+
+    @patch("components.data_loaders.AzureBlobLoader._SPOOL_THRESHOLD", 8)
+    @patch("azure.storage.blob.aio.BlobServiceClient")
+    def test_build_spools_large_blobs_to_disk(self, mock_blob_service, component):
+        """Test that blobs above the spool threshold are streamed to a file instead of read into memory."""
+        mock_service_client = MagicMock()
+        mock_container_client = MagicMock()
+        mock_blob_service.from_connection_string.return_value = mock_service_client
+        mock_service_client.get_container_client.return_value = mock_container_client
+
+        small = _mock_download(b"# Small")
+        large = _mock_download(b"# Large document body")
+        downloads = {"small.md": small, "large.md": large}
+        mock_container_client.list_blobs.return_value = _AsyncIterator([_mock_blob("small.md"), _mock_blob("large.md")])
+        mock_container_client.download_blob = AsyncMock(side_effect=lambda name, **kwargs: downloads[name])
+
+        result = component.build()
+
+        docs = {doc.data["source"]: doc.data for doc in result}
+        assert docs["large.md"]["text"] == "# Large document body"
+        assert docs["large.md"]["checksum"] == hashlib.md5(b"# Large document body").hexdigest()
+        large.readinto.assert_awaited_once()
+        large.readall.assert_not_awaited()
+        small.readall.assert_awaited_once()
+
+    def test_md5_batch_matches_hashlib(self):
+        """Test that batched client-side hashing returns digests in input order."""
+        payloads = [b"", b"a", b"b" * 4096, b"c" * 10_000]
+
+        assert _md5_batch(payloads) == [hashlib.md5(payload).hexdigest() for payload in payloads]
+
     def test_component_display_properties(self):
         """Test component display properties."""
         comp = AzureBlobLoader()
@@ -1,12 +1,23 @@
 """Tests for YborQdrant component."""
 
-import hashlib
-from unittest.mock import MagicMock, Mock, patch
+import uuid
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
+import numpy as np
 import pytest
+import xxhash
+from langchain.embeddings.base import Embeddings
 from langchain.schema import Document
+from langflow.schema import Data
+from qdrant_client.models import Distance, ScalarType
 
-from components.vectorstores.YborQdrant import YborQdrantComponent
+from components.vectorstores.YborQdrant import (
+    YborQdrantComponent,
+    _encode_batch,
+    _fold_hex_rows,
+    _fold_hex_rows_loop,
+    _fold_hex_rows_numpy,
+)
 
 
 class TestYborQdrantComponent:
@@ -31,13 +42,27 @@ class TestYborQdrantComponent:
         comp.operation_mode = "upsert"
         comp.id_strategy = "etag"
         comp.preserve_existing = True
-        comp.prefer_grpc = False
+        comp.skip_unchanged = False
+        comp.prefer_grpc = "Auto"
+        comp.quantize_vectors = True
+        comp.upload_batch_size = 256
+        comp.upload_parallel = 8
+        comp.wait_for_indexing = True
         comp.number_of_results = 4
         comp.search_query = ""
         comp.ingest_data = []
         comp.log = MagicMock()
         return comp
 
+    @pytest.fixture
+    def mock_async_client(self):
+        """Patch AsyncQdrantClient and return the client instance the component will create."""
+        with patch("components.vectorstores.YborQdrant.AsyncQdrantClient") as mock_async_client_class:
+            client = mock_async_client_class.return_value
+            client.upsert = AsyncMock()
+            client.close = AsyncMock()
+            yield client
+
     def test_generate_point_id_content_hash(self, component):
         """Test ID generation using content hash strategy."""
         doc = Document(page_content="test content", metadata={})
@@ -45,7 +70,7 @@ class TestYborQdrantComponent:
 
         point_id = component._generate_point_id(doc, "content_hash")
 
-        expected_hash = hashlib.md5(b"test content").hexdigest()
+        expected_hash = xxhash.xxh3_128_hexdigest(b"test content")
         assert point_id == expected_hash
 
     def test_generate_point_id_source_path(self, component):
@@ -55,7 +80,7 @@ class TestYborQdrantComponent:
 
         point_id = component._generate_point_id(doc, "source_path")
 
-        expected_hash = hashlib.md5(b"/path/to/file.txt").hexdigest()
+        expected_hash = xxhash.xxh3_128_hexdigest(b"/path/to/file.txt")
         assert point_id == expected_hash
 
     def test_generate_point_id_etag(self, component):
@@ -70,6 +95,23 @@ class TestYborQdrantComponent:
         assert isinstance(point_id, int)
         assert point_id > 0
 
+    def test_generate_point_id_etag_strips_quotes_and_prefix(self, component):
+        """Test that quoted, 0x-prefixed etags parse to the same integer as the bare hex value."""
+        doc = Document(page_content="test", metadata={"etag": '"0x8DCABCDEF123456"'})
+
+        point_id = component._generate_point_id(doc, "etag")
+
+        assert point_id == int("8DCABCDEF123456", 16)
+
+    def test_generate_point_id_etag_hashes_non_hex_and_long_etags(self, component):
+        """Test that etags that cannot be parsed as a 64-bit integer get a stable XXH3-64 ID."""
+        for etag in ["W/not-hex", "0x1" + "0" * 20]:
+            doc = Document(page_content="test", metadata={"etag": etag})
+
+            point_id = component._generate_point_id(doc, "etag")
+
+            assert point_id == xxhash.xxh3_64_intdigest(etag.encode("utf-8")) & 0x7FFFFFFFFFFFFFFF
+
     def test_generate_point_id_checksum(self, component):
         """Test ID generation using checksum strategy."""
         checksum = "abc123def456"
@@ -78,10 +120,28 @@ class TestYborQdrantComponent:
 
         point_id = component._generate_point_id(doc, "checksum")
 
-        # Should hash the checksum to get a safe integer
-        assert isinstance(point_id, int)
+        # Should take the low 63 bits of the hex checksum directly
+        assert point_id == int(checksum[-16:], 16) & 0x7FFFFFFFFFFFFFFF
         assert point_id > 0
 
+    def test_generate_point_id_checksum_truncates_digest(self, component):
+        """Test that a full MD5 checksum is truncated to its low 64 bits."""
+        checksum = "9e107d9d372bb6826bd81d3542a419d6"
+        doc = Document(page_content="test", metadata={"checksum": checksum})
+
+        point_id = component._generate_point_id(doc, "checksum")
+
+        assert point_id == 0x6BD81D3542A419D6
+
+    def test_generate_point_id_checksum_hashes_non_hex(self, component):
+        """Test that a checksum that is not hex gets a stable XXH3-64 ID."""
+        checksum = "1B2M2Y8AsgTpgAmY7PhCfg=="
+        doc = Document(page_content="test", metadata={"checksum": checksum})
+
+        point_id = component._generate_point_id(doc, "checksum")
+
+        assert point_id == xxhash.xxh3_64_intdigest(checksum.encode("utf-8")) & 0x7FFFFFFFFFFFFFFF
+
     def test_generate_point_id_auto_uuid(self, component):
         """Test ID generation using auto_uuid strategy."""
         doc = Document(page_content="test", metadata={})
@@ -89,33 +149,210 @@ class TestYborQdrantComponent:
 
         point_id = component._generate_point_id(doc, "auto_uuid")
 
-        # Should generate a new UUID as integer
-        assert isinstance(point_id, int)
-        assert point_id > 0
+        # Should generate a new UUID string that Qdrant accepts natively
+        assert isinstance(point_id, str)
+        assert str(uuid.UUID(point_id)) == point_id
+        assert component._generate_point_id(doc, "auto_uuid") != point_id
+
+    def test_generate_point_ids_bulk_matches_single(self, component):
+        """Test that bulk ID generation returns the per-document IDs in order."""
+        docs = [
+            Document(page_content=f"content {i}", metadata={"source": f"/file{i}.md", "etag": f"0x8DC{i}"})
+            for i in range(3)
+        ]
+
+        for strategy in ["content_hash", "source_path", "etag"]:
+            expected = [component._generate_point_id(doc, strategy) for doc in docs]
+            assert component._generate_point_ids_bulk(docs, strategy) == expected
+
+    @patch("components.vectorstores.YborQdrant._VECTORIZE_MIN_BATCH", 1)
+    def test_generate_point_ids_bulk_etag_vectorized(self, component):
+        """Test that the vectorised etag parser agrees with the per-document strategy."""
+        etags = ['"0x8DCABCDEF123456"', "0xffffffffffffffff", "0x0", "not-hex", None, "0x1" + "0" * 20, "0Xabc"]
+        docs = [Document(page_content="test", metadata={"etag": etag}) for etag in etags]
+
+        point_ids = component._generate_point_ids_bulk(docs, "etag")
+
+        assert point_ids[0] == int("8DCABCDEF123456", 16)
+        assert point_ids[1] == 2**64 - 1
+        assert point_ids[6] == 0xABC
+        for doc, point_id in zip(docs[:4] + docs[6:], point_ids[:4] + point_ids[6:], strict=True):
+            assert point_id == component._generate_point_id(doc, "etag")
+        assert all(isinstance(point_id, int) and point_id > 0 for point_id in point_ids)
+
+    @patch("components.vectorstores.YborQdrant._VECTORIZE_MIN_BATCH", 1)
+    def test_generate_point_ids_bulk_checksum_vectorized(self, component):
+        """Test that the vectorised checksum parser agrees with the per-document strategy."""
+        checksums = ["d41d8cd98f00b204e9800998ecf8427e", "ABCDEF", "8" + "0" * 15, "not-hex", None]
+        docs = [Document(page_content="test", metadata={"checksum": checksum}) for checksum in checksums]
+
+        point_ids = component._generate_point_ids_bulk(docs, "checksum")
+
+        assert point_ids[0] == int("e9800998ecf8427e", 16) & 0x7FFFFFFFFFFFFFFF
+        assert point_ids[1] == 0xABCDEF
+        for doc, point_id in zip(docs[:4], point_ids[:4], strict=True):
+            assert point_id == component._generate_point_id(doc, "checksum")
+        assert all(isinstance(point_id, int) and point_id > 0 for point_id in point_ids)
+
+    @patch("components.vectorstores.YborQdrant._VECTORIZE_MIN_BATCH", 1)
+    def test_generate_point_ids_bulk_encodes_batch_once(self, component):
+        """Test that the batch content_hash and source_path paths match per-document hashing."""
+        docs = [
+            Document(page_content="# Title", metadata={"source": "/docs/a.md"}),
+            Document(page_content="", metadata={"source": "/docs/b.md"}),
+            Document(page_content="café", metadata={}),
+        ]
+
+        content_ids = component._generate_point_ids_bulk(docs, "content_hash")
+        source_ids = component._generate_point_ids_bulk(docs[:2], "source_path")
+        ascii_ids = component._generate_point_ids_bulk(docs[:2], "content_hash")
+
+        assert content_ids == [component._generate_point_id(doc, "content_hash") for doc in docs]
+        assert ascii_ids == content_ids[:2]
+        assert source_ids == [xxhash.xxh3_128_hexdigest(b"/docs/a.md"), xxhash.xxh3_128_hexdigest(b"/docs/b.md")]
+        assert uuid.UUID(component._generate_point_ids_bulk(docs, "source_path")[2])
+
+    @patch("components.vectorstores.YborQdrant._VECTORIZE_MIN_BATCH", 1)
+    def test_generate_point_ids_bulk_hashes_duplicate_contents_once(self, component):
+        """Test that repeated contents in a batch are hashed once and still get an ID per document."""
+        docs = [Document(page_content=text, metadata={}) for text in ["header", "body", "header", "header"]]
+
+        with patch.object(xxhash, "xxh3_128_hexdigest", wraps=xxhash.xxh3_128_hexdigest) as spy:
+            point_ids = component._generate_point_ids_bulk(docs, "content_hash")
+
+        assert spy.call_count == 2
+        assert point_ids == [xxhash.xxh3_128_hexdigest(doc.page_content.encode("utf-8")) for doc in docs]
+
+    def test_encode_batch_shares_one_buffer_for_ascii_texts(self):
+        """Test that ASCII texts are views of one buffer even when the batch also holds non-ASCII texts."""
+        texts = ["# Title", "café", "", "body"]
+
+        encoded = _encode_batch(texts)
+
+        assert [bytes(content) for content in encoded] == [text.encode("utf-8") for text in texts]
+        assert isinstance(encoded[1], bytes)
+        assert encoded[0].obj is encoded[2].obj is encoded[3].obj
+
+    def test_fold_hex_rows_kernels_agree(self):
+        """Test that the NumPy SWAR, pure-Python and active hex fold kernels return the same integers."""
+        values = ["8DCABCDEF123456", "ffffffffffffffff", "0", "abc", "0123456789AbCdEf", "fedcba9876543210"]
+        digits = np.frombuffer("".join(v.rjust(16, "0") for v in values).encode("ascii"), dtype=np.uint8)
+        digits = digits.reshape(-1, 16)
+        expected = [int(v, 16) for v in values]
+
+        assert _fold_hex_rows_numpy(digits).tolist() == expected
+        assert _fold_hex_rows_loop(digits).tolist() == expected
+        assert _fold_hex_rows(digits).tolist() == expected
+
+    def test_upsert_operation_falls_back_per_document(self, mock_async_client, component):
+        """Test that a document whose ID cannot be generated gets a fallback UUID without failing the batch."""
+        component.embedding = Mock()
+        component.embedding.embed_documents.return_value = [[0.1], [0.2]]
+        component.id_strategy = "source_path"
+        docs = [
+            Document(page_content="good", metadata={"source": "/good.md"}),
+            Document(page_content="bad", metadata={"source": 42}),
+        ]
+
+        component._perform_upsert_operation(Mock(), "test_collection", docs)
+
+        batch = mock_async_client.upsert.call_args.kwargs["points"]
+        assert batch.ids[0] == xxhash.xxh3_128_hexdigest(b"/good.md")
+        assert len(batch.ids[1]) == 32
 
     @patch("components.vectorstores.YborQdrant.QdrantClient")
     def test_create_collection_if_not_exists_new(self, mock_client_class, component):
         """Test collection creation when it doesn't exist."""
         mock_client = Mock()
-        mock_client.get_collection.side_effect = Exception("Collection not found")
+        mock_client.collection_exists.return_value = False
         mock_client.create_collection.return_value = None
 
         component._create_collection_if_not_exists(mock_client, "test_collection", 384)
 
-        mock_client.get_collection.assert_called_once_with("test_collection")
+        mock_client.collection_exists.assert_called_once_with("test_collection")
+        mock_client.get_collection.assert_not_called()
         mock_client.create_collection.assert_called_once()
 
+    def test_create_collection_quantizes_vectors(self, component):
+        """Test that new collections get int8 scalar quantization with the original vectors on disk."""
+        mock_client = Mock()
+        mock_client.collection_exists.return_value = False
+
+        component._create_collection_if_not_exists(mock_client, "test_collection", 384)
+
+        kwargs = mock_client.create_collection.call_args.kwargs
+        assert kwargs["quantization_config"].scalar.type == ScalarType.INT8
+        assert kwargs["quantization_config"].scalar.always_ram is True
+        assert kwargs["vectors_config"].on_disk is True
+
+    def test_create_collection_maps_distance_func(self, component):
+        """Test that each distance function option creates the collection with the matching Qdrant distance."""
+        expected = {"Cosine": Distance.COSINE, "Euclidean": Distance.EUCLID, "Dot Product": Distance.DOT}
+        for distance_func, distance in expected.items():
+            mock_client = Mock()
+            mock_client.collection_exists.return_value = False
+            component.distance_func = distance_func
+
+            component._create_collection_if_not_exists(mock_client, f"collection_{distance_func}", 384)
+
+            assert mock_client.create_collection.call_args.kwargs["vectors_config"].distance == distance
+
+    def test_create_collection_without_quantization(self, component):
+        """Test that quantization can be turned off for new collections."""
+        mock_client = Mock()
+        mock_client.collection_exists.return_value = False
+        component.quantize_vectors = False
+
+        component._create_collection_if_not_exists(mock_client, "test_collection", 384)
+
+        kwargs = mock_client.create_collection.call_args.kwargs
+        assert kwargs["quantization_config"] is None
+        assert kwargs["vectors_config"].on_disk is False
+
     @patch("components.vectorstores.YborQdrant.QdrantClient")
     def test_create_collection_if_not_exists_existing(self, mock_client_class, component):
         """Test collection creation when it already exists."""
         mock_client = Mock()
-        mock_client.get_collection.return_value = {"status": "ok"}
+        mock_client.collection_exists.return_value = True
 
         component._create_collection_if_not_exists(mock_client, "test_collection", 384)
 
-        mock_client.get_collection.assert_called_once_with("test_collection")
+        mock_client.collection_exists.assert_called_once_with("test_collection")
         mock_client.create_collection.assert_not_called()
 
+    def test_create_collection_if_not_exists_checks_once(self, component):
+        """Test that a collection confirmed to exist is not looked up again by the same component."""
+        mock_client = Mock()
+
+        component._create_collection_if_not_exists(mock_client, "test_collection", 384)
+        component._create_collection_if_not_exists(mock_client, "test_collection", 384)
+
+        mock_client.collection_exists.assert_called_once_with("test_collection")
+
+    def test_create_collection_if_not_exists_rechecks_for_new_client(self, component):
+        """Test that collections ensured through one client are looked up again through another."""
+        first_client, second_client = Mock(), Mock()
+
+        component._create_collection_if_not_exists(first_client, "test_collection", 384)
+        component._create_collection_if_not_exists(second_client, "test_collection", 384)
+
+        first_client.collection_exists.assert_called_once_with("test_collection")
+        second_client.collection_exists.assert_called_once_with("test_collection")
+
+    def test_create_collection_if_not_exists_rechecks_after_failed_upload(self, mock_async_client, component):
+        """Test that a failed upload makes the next build look the collection up again."""
+        mock_client = Mock()
+        mock_async_client.upsert.side_effect = RuntimeError("Not found: Collection `test_collection` doesn't exist!")
+        component._create_collection_if_not_exists(mock_client, "test_collection", 384)
+        component._ensured_collections.add(("test_collection", 768))
+
+        with pytest.raises(RuntimeError):
+            component._upload_points(mock_client, "test_collection", [1], [[0.1]], [{}])
+        component._create_collection_if_not_exists(mock_client, "test_collection", 384)
+
+        assert mock_client.collection_exists.call_count == 2
+        assert ("test_collection", 768) not in component._ensured_collections
+
     @patch("components.vectorstores.YborQdrant.QdrantClient")
     def test_get_existing_point_ids(self, mock_client_class, component):
         """Test retrieving existing point IDs from collection."""
@@ -135,6 +372,235 @@ class TestYborQdrantComponent:
 
         assert existing_ids == {"id1", "id2"}
         assert mock_client.scroll.call_count == 2
+        assert mock_client.scroll.call_args.kwargs["limit"] == 10_000
+
+    def test_get_existing_point_ids_for_candidates(self, component):
+        """Test that candidate IDs are looked up directly instead of scrolling the collection."""
+        mock_client = Mock()
+        mock_point = Mock()
+        mock_point.id = 1
+        mock_client.retrieve.return_value = [mock_point]
+
+        existing_ids = component._get_existing_point_ids(mock_client, "test_collection", [1, 2])
+
+        assert existing_ids == {"1"}
+        mock_client.retrieve.assert_called_once_with(
+            collection_name="test_collection", ids=[1, 2], with_payload=False, with_vectors=False
+        )
+        mock_client.scroll.assert_not_called()
+
+    @patch("components.vectorstores.YborQdrant._SCROLL_PAGE_SIZE", 2)
+    def test_get_existing_point_ids_for_candidates_in_pages(self, component):
+        """Test that a large candidate list is looked up in bounded retrieve requests."""
+        mock_client = Mock()
+        mock_client.retrieve.side_effect = [[Mock(id=1)], [], [Mock(id=5)]]
+
+        existing_ids = component._get_existing_point_ids(mock_client, "test_collection", [1, 2, 3, 4, 5])
+
+        assert existing_ids == {"1", "5"}
+        assert [call.kwargs["ids"] for call in mock_client.retrieve.call_args_list] == [[1, 2], [3, 4], [5]]
+
+    def test_upsert_operation_embeds_documents_in_one_batch(self, mock_async_client, component):
+        """Test that all documents are embedded with a single embed_documents call."""
+        component.embedding = Mock()
+        component.embedding.embed_documents.return_value = [[0.1, 0.2], [0.3, 0.4]]
+        mock_client = Mock()
+        docs = [
+            Document(page_content="first", metadata={"etag": "0x1"}),
+            Document(page_content="second", metadata={"etag": "0x2"}),
+        ]
+
+        component._perform_upsert_operation(mock_client, "test_collection", docs)
+
+        component.embedding.embed_documents.assert_called_once_with(["first", "second"])
+        component.embedding.embed_query.assert_not_called()
+        batch = mock_async_client.upsert.call_args.kwargs["points"]
+        assert batch.vectors == [[0.1, 0.2], [0.3, 0.4]]
+        mock_async_client.close.assert_awaited_once()
+
+    def test_upsert_operation_skips_existing_points(self, mock_async_client, component):
+        """Test that upsert looks up the batch IDs and only embeds documents that are not stored yet."""
+        component.embedding = Mock()
+        component.embedding.embed_documents.return_value = [[0.3]]
+        component.id_strategy = "content_hash"
+        component.skip_unchanged = True
+        mock_client = Mock()
+        mock_client.collection_exists.return_value = True
+        stored_id = xxhash.xxh3_128_hexdigest(b"unchanged")
+        mock_client.retrieve.return_value = [Mock(id=str(uuid.UUID(stored_id)))]
+        docs = [Document(page_content="unchanged"), Document(page_content="new")]
+
+        component._perform_upsert_operation(mock_client, "test_collection", docs)
+
+        assert mock_client.retrieve.call_args.kwargs["ids"] == [stored_id, xxhash.xxh3_128_hexdigest(b"new")]
+        mock_client.scroll.assert_not_called()
+        component.embedding.embed_documents.assert_called_once_with(["new"])
+        batch = mock_async_client.upsert.call_args.kwargs["points"]
+        assert batch.ids == [xxhash.xxh3_128_hexdigest(b"new")]
+
+    def test_upsert_operation_skips_points_stored_unhyphenated(self, mock_async_client, component):
+        """Test that IDs returned in the un-hyphenated form of local storage still count as existing."""
+        component.embedding = Mock()
+        component.id_strategy = "content_hash"
+        component.skip_unchanged = True
+        mock_client = Mock()
+        mock_client.collection_exists.return_value = True
+        stored_id = xxhash.xxh3_128_hexdigest(b"unchanged")
+        mock_client.retrieve.return_value = [Mock(id=stored_id)]
+
+        component._perform_upsert_operation(mock_client, "test_collection", [Document(page_content="unchanged")])
+
+        component.embedding.embed_documents.assert_not_called()
+        mock_async_client.upsert.assert_not_called()
+
+    def test_upsert_operation_updates_existing_points_by_default(self, mock_async_client, component):
+        """Test that upsert re-embeds and re-uploads stored documents unless skip_unchanged is enabled."""
+        component.embedding = Mock()
+        component.embedding.embed_documents.return_value = [[0.3]]
+        component.id_strategy = "content_hash"
+        mock_client = Mock()
+        docs = [Document(page_content="unchanged")]
+
+        component._perform_upsert_operation(mock_client, "test_collection", docs)
+
+        mock_client.retrieve.assert_not_called()
+        batch = mock_async_client.upsert.call_args.kwargs["points"]
+        assert batch.ids == [xxhash.xxh3_128_hexdigest(b"unchanged")]
+
+    def test_upsert_operation_skip_unchanged_uses_ensured_collections(self, mock_async_client, component):
+        """Test that skip_unchanged does not look up a collection this component already ensured."""
+        component.embedding = Mock()
+        component.embedding.embed_documents.return_value = [[0.3]]
+        component.id_strategy = "content_hash"
+        component.skip_unchanged = True
+        mock_client = Mock()
+        mock_client.retrieve.return_value = []
+        component._create_collection_if_not_exists(mock_client, "test_collection", 1)
+        mock_client.collection_exists.reset_mock()
+
+        component._perform_upsert_operation(mock_client, "test_collection", [Document(page_content="new")])
+
+        mock_client.collection_exists.assert_not_called()
+        mock_client.retrieve.assert_called_once()
+
+    def test_append_and_overwrite_skip_existing_point_lookup(self, mock_async_client, component):
+        """Test that append and overwrite modes never look up which points are already stored."""
+        component.embedding = Mock()
+        component.embedding.embed_documents.return_value = [[0.1]]
+        docs = [Document(page_content="only", metadata={"etag": "0x1"})]
+
+        for perform_operation in (component._perform_append_operation, component._perform_overwrite_operation):
+            mock_client = Mock()
+
+            perform_operation(mock_client, "test_collection", docs)
+
+            mock_client.scroll.assert_not_called()
+            mock_client.retrieve.assert_not_called()
+
+    def test_embed_documents_skips_duplicate_texts(self, component):
+        """Test that repeated page contents are embedded once and mapped back to every document."""
+        component.embedding = Mock()
+        component.embedding.embed_documents.return_value = [[1.0], [2.0]]
+        docs = [Document(page_content=text) for text in ["header", "body", "header"]]
+
+        vectors = component._embed_documents(docs)
+
+        component.embedding.embed_documents.assert_called_once_with(["header", "body"])
+        assert vectors == [[1.0], [2.0], [1.0]]
+
+    def test_upload_points_chunks_by_default_batch_size(self, mock_async_client, component):
+        """Test that an unset batch size falls back to 256 points per upsert request."""
+        component.upload_batch_size = None
+        ids = list(range(600))
+
+        component._upload_points(Mock(), "test_collection", ids, [[0.1]] * 600, [{}] * 600)
+
+        batches = [call.kwargs["points"] for call in mock_async_client.upsert.call_args_list]
+        assert sorted(len(batch.ids) for batch in batches) == [88, 256, 256]
+
+    def test_upload_points_sends_concurrent_batches(self, mock_async_client, component):
+        """Test that points are split into upload_batch_size chunks sent through the async client."""
+        component.upload_batch_size = 2
+        ids = [1, 2, 3, 4, 5]
+
+        component._upload_points(Mock(), "test_collection", ids, [[0.1]] * 5, [{}] * 5)
+
+        batches = [call.kwargs["points"] for call in mock_async_client.upsert.call_args_list]
+        assert [batch.ids for batch in batches] == [[1, 2], [3, 4], [5]]
+        assert [call.kwargs["wait"] for call in mock_async_client.upsert.call_args_list] == [False, False, True]
+
+    def test_upload_points_local_path_uses_sync_client(self, component):
+        """Test that local storage mode uploads through the already opened synchronous client."""
+        component.path = "/tmp/qdrant"
+        mock_client = Mock()
+
+        component._upload_points(mock_client, "test_collection", [1], [[0.1]], [{}])
+
+        mock_client.upload_collection.assert_called_once()
+
+    @patch("components.vectorstores.YborQdrant._BULK_UPLOAD_SIZE", 2)
+    def test_upload_points_pauses_indexing_for_bulk_uploads(self, mock_async_client, component):
+        """Test that indexing is disabled during a bulk upload and restored afterwards."""
+        mock_client = Mock()
+        mock_client.get_collection.return_value.config.optimizer_config.indexing_threshold = 5000
+
+        component._upload_points(mock_client, "test_collection", [1, 2], [[0.1], [0.2]], [{}, {}])
+
+        thresholds = [
+            call.kwargs["optimizers_config"].indexing_threshold for call in mock_client.update_collection.call_args_list
+        ]
+        assert thresholds == [0, 5000]
+        mock_async_client.upsert.assert_awaited_once()
+
+    def test_server_kwargs_prefer_grpc_with_api_key(self, component):
+        """Test that gRPC is used for API key connections and left off otherwise."""
+        assert "prefer_grpc" not in component._get_server_kwargs()
+
+        component.api_key = "secret"
+        assert component._get_server_kwargs()["prefer_grpc"] is True
+
+    def test_server_kwargs_prefer_grpc_override(self, component):
+        """Test that an explicit gRPC choice wins over the API key default."""
+        component.api_key = "secret"
+        component.prefer_grpc = "No"
+        assert "prefer_grpc" not in component._get_server_kwargs()
+
+        component.api_key = None
+        for prefer_grpc in ("Yes", True):
+            component.prefer_grpc = prefer_grpc
+            assert component._get_server_kwargs()["prefer_grpc"] is True
+
+    @patch("components.vectorstores.YborQdrant.QdrantClient")
+    def test_get_client_reuses_client_for_same_settings(self, mock_client_class, component):
+        """Test that the QdrantClient is cached until the connection settings change, then closed."""
+        mock_client_class.side_effect = lambda **kwargs: Mock()
+        first = component._get_client()
+        second = component._get_client()
+        assert first is second
+        assert mock_client_class.call_count == 1
+
+        component._ensured_collections.add(("test_collection", 384))
+        component.port = 7333
+        replacement = component._get_client()
+        assert mock_client_class.call_count == 2
+        assert not component._ensured_collections
+        first.close.assert_called_once()
+        replacement.close.assert_not_called()
+
+    @patch("components.vectorstores.YborQdrant.Qdrant")
+    @patch("components.vectorstores.YborQdrant.QdrantClient")
+    def test_build_vector_store_reuses_client_across_ingests(self, mock_client_class, mock_qdrant_class, component):
+        """Test that two ingests with the same settings share one QdrantClient."""
+        component.embedding = Mock(spec=Embeddings)
+        component.ingest_data = [Data(text="doc", data={"etag": "0x1"})]
+
+        with patch.object(component, "_perform_upsert_operation") as mock_upsert:
+            component.build_vector_store()
+            component._cached_vector_store = None
+            component.build_vector_store()
+
+        assert mock_client_class.call_count == 1
+        assert mock_upsert.call_args_list[0].args[0] is mock_upsert.call_args_list[1].args[0]
 
     def test_operation_mode_values(self, component):
         """Test that operation_mode accepts valid values."""